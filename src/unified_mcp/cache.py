@@ -0,0 +1,215 @@
+"""Caching of proxied resource reads and aggregated listings.
+
+Reads are keyed on the prefixed URI the client sees and held in a byte-budgeted
+LRU. Listings of resources, resource templates and prompts are cached whole.
+Entries are invalidated by child `notifications/resources/updated` and
+`list_changed` notifications, with a TTL as a fallback for children that
+never send them. A listing is not cached when any mounted child failed to
+contribute to it, so a child that is starting up or has crashed does not
+drop out of the aggregate for a whole TTL.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Sequence, Tuple
+
+from fastmcp.client.messages import MessageHandler
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+from fastmcp.server.server import add_resource_prefix, has_resource_prefix
+
+LISTINGS = ("resources", "resource_templates", "prompts")
+
+
+def _has_prefix(uri: str, prefix: str) -> bool:
+    try:
+        return has_resource_prefix(uri, prefix)
+    except ValueError:
+        return False
+
+
+class ResourceCache:
+    """Byte-budgeted LRU of resource reads plus TTL-cached listings"""
+
+    def __init__(self, max_bytes: int, ttl: float = 300.0):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.listing_failures = 0
+        # Bumped by invalidations so a read that started before one is not cached
+        self._epoch = 0
+        self._updates: dict = {}
+        self._reads: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        self._listings: dict = {}
+
+    def __len__(self) -> int:
+        return len(self._reads)
+
+    def get_read(self, uri: str) -> Optional[Any]:
+        entry = self._reads.get(uri)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                self.invalidate_read(uri)
+            self.misses += 1
+            return None
+        self._reads.move_to_end(uri)
+        self.hits += 1
+        return entry[2]
+
+    def read_token(self, uri: str) -> Tuple[int, int]:
+        """Return a token that changes whenever the URI is invalidated"""
+        return self._epoch, self._updates.get(uri, 0)
+
+    def put_read(
+        self, uri: str, contents: Any, size: int, token: Optional[Tuple[int, int]] = None
+    ) -> None:
+        """Cache a read, unless it was invalidated since token was taken"""
+        if token is not None and token != self.read_token(uri):
+            return
+        self.invalidate_read(uri)
+        if size > self.max_bytes:
+            return
+        self._reads[uri] = (time.monotonic() + self.ttl, size, contents)
+        self.size += size
+        while self.size > self.max_bytes:
+            _, (_, evicted, _) = self._reads.popitem(last=False)
+            self.size -= evicted
+
+    def invalidate_read(self, uri: str) -> None:
+        entry = self._reads.pop(uri, None)
+        if entry is not None:
+            self.size -= entry[1]
+
+    def mark_updated(self, uri: str) -> None:
+        """Drop a read and discard any read of it still in progress"""
+        self._updates[uri] = self._updates.get(uri, 0) + 1
+        self.invalidate_read(uri)
+
+    def get_listing(self, kind: str) -> Optional[Any]:
+        entry = self._listings.get(kind)
+        if entry is None or entry[0] <= time.monotonic():
+            self._listings.pop(kind, None)
+            return None
+        return entry[1]
+
+    def put_listing(self, kind: str, items: Any) -> None:
+        self._listings[kind] = (time.monotonic() + self.ttl, items)
+
+    def invalidate_listings(self, *kinds: str) -> None:
+        for kind in kinds or LISTINGS:
+            self._listings.pop(kind, None)
+
+    def invalidate_server(self, prefix: str) -> None:
+        """Drop all reads served by a mounted server and every listing"""
+        self._epoch += 1
+        self._updates.clear()
+        for uri in [uri for uri in self._reads if _has_prefix(uri, prefix)]:
+            self.invalidate_read(uri)
+        self.invalidate_listings()
+
+
+def contents_size(contents: Sequence[Any]) -> int:
+    """Approximate the memory held by a resource read result in bytes"""
+    size = 0
+    for item in contents:
+        content = item.content
+        size += len(content.encode() if isinstance(content, str) else content)
+    return size
+
+
+class ResourceCacheMiddleware(Middleware):
+    """Serve resource reads and listings from a ResourceCache.
+
+    on_fill is started as a background task with the URI after each cache
+    miss, so the caller can subscribe to updates for that resource on the
+    child without delaying the read.
+    """
+
+    def __init__(
+        self,
+        cache: ResourceCache,
+        on_fill: Optional[Callable[[str], Any]] = None,
+    ):
+        self.cache = cache
+        self.on_fill = on_fill
+        self._fill_tasks = set()
+
+    async def on_read_resource(self, context: MiddlewareContext, call_next):
+        uri = str(context.message.uri)
+        contents = self.cache.get_read(uri)
+        if contents is not None:
+            return contents
+
+        token = self.cache.read_token(uri)
+        contents = list(await call_next(context))
+        self.cache.put_read(uri, contents, contents_size(contents), token)
+        if self.on_fill is not None:
+            task = asyncio.create_task(self.on_fill(uri))
+            self._fill_tasks.add(task)
+            task.add_done_callback(self._fill_tasks.discard)
+        return contents
+
+    async def _listing(self, kind: str, context: MiddlewareContext, call_next):
+        items = self.cache.get_listing(kind)
+        if items is None:
+            failures = self.cache.listing_failures
+            items = list(await call_next(context))
+            if self.cache.listing_failures == failures:
+                self.cache.put_listing(kind, items)
+        return items
+
+    async def on_list_resources(self, context: MiddlewareContext, call_next):
+        return await self._listing("resources", context, call_next)
+
+    async def on_list_resource_templates(self, context: MiddlewareContext, call_next):
+        return await self._listing("resource_templates", context, call_next)
+
+    async def on_list_prompts(self, context: MiddlewareContext, call_next):
+        return await self._listing("prompts", context, call_next)
+
+
+class MountListingMiddleware(Middleware):
+    """Record listing failures of a mounted child on the shared cache.
+
+    Added to each mounted proxy, since the parent logs and skips a failing
+    mount and would otherwise cache the partial aggregate.
+    """
+
+    def __init__(self, cache: ResourceCache):
+        self.cache = cache
+
+    async def _listing(self, context: MiddlewareContext, call_next):
+        try:
+            return await call_next(context)
+        except Exception:
+            self.cache.listing_failures += 1
+            raise
+
+    async def on_list_resources(self, context: MiddlewareContext, call_next):
+        return await self._listing(context, call_next)
+
+    async def on_list_resource_templates(self, context: MiddlewareContext, call_next):
+        return await self._listing(context, call_next)
+
+    async def on_list_prompts(self, context: MiddlewareContext, call_next):
+        return await self._listing(context, call_next)
+
+
+class CacheInvalidationHandler(MessageHandler):
+    """Invalidate cache entries when a mounted child reports changes"""
+
+    def __init__(self, cache: ResourceCache, prefix: str):
+        super().__init__()
+        self.cache = cache
+        self.prefix = prefix
+
+    async def on_resource_updated(self, message) -> None:
+        self.cache.mark_updated(add_resource_prefix(str(message.params.uri), self.prefix))
+
+    async def on_resource_list_changed(self, message) -> None:
+        self.cache.invalidate_server(self.prefix)
+
+    async def on_prompt_list_changed(self, message) -> None:
+        self.cache.invalidate_listings("prompts")
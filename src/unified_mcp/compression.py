@@ -0,0 +1,133 @@
+"""Negotiated gzip/zstd compression for streamable-HTTP responses.
+
+Starlette's GZipMiddleware skips `text/event-stream`, which is how streamable
+HTTP delivers most tool results, and has no zstd support. This middleware
+compresses POST event streams whenever an encoding was negotiated, since a
+small progress or log event often precedes the large result; the stream is
+flushed after every chunk so events still arrive promptly. Other responses
+are compressed when their first body chunk reaches the size threshold.
+"""
+
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional, gzip is always available
+    zstandard = None
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick zstd or gzip from an Accept-Encoding header, preferring zstd"""
+    accepted = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+
+    for coding in ("zstd", "gzip"):
+        if coding == "zstd" and zstandard is None:
+            continue
+        if accepted.get(coding, accepted.get("*", 0.0)) > 0:
+            return coding
+    return None
+
+
+class _Compressor:
+    """Streaming compressor that can flush after each chunk"""
+
+    def __init__(self, encoding: str, level: Optional[int] = None):
+        if encoding == "zstd":
+            self._obj = zstandard.ZstdCompressor(level=level or 3).compressobj()
+            self._sync_flush = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        else:
+            self._obj = zlib.compressobj(level or 6, zlib.DEFLATED, 31)
+            self._sync_flush = zlib.Z_SYNC_FLUSH
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        out = self._obj.compress(data)
+        return out + (self._obj.flush() if final else self._obj.flush(self._sync_flush))
+
+
+def _start_compression(
+    headers: MutableHeaders, encoding: str, level: Optional[int]
+) -> _Compressor:
+    """Mark response headers as encoded and return the matching compressor"""
+    headers["Content-Encoding"] = encoding
+    headers.add_vary_header("Accept-Encoding")
+    if "content-length" in headers:
+        del headers["content-length"]
+    return _Compressor(encoding, level)
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing POST event streams and responses above minimum_size bytes"""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 4096, level: Optional[int] = None):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, compressor, passthrough
+
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=message["headers"])
+                if not headers.get("content-type", "").startswith("text/event-stream"):
+                    start_message = message
+                elif scope["method"] == "GET" or "content-encoding" in headers:
+                    # Long-lived GET notification streams are sent as-is
+                    passthrough = True
+                    await send(message)
+                else:
+                    compressor = _start_compression(headers, encoding, self.level)
+                    await send(message)
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                if len(body) < self.minimum_size or "content-encoding" in headers:
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                compressor = _start_compression(headers, encoding, self.level)
+                await send(start_message)
+
+            await send({
+                "type": "http.response.body",
+                "body": compressor.compress(body, final=not more_body),
+                "more_body": more_body,
+            })
+
+        await self.app(scope, receive, send_compressed)
@@ -1,6 +1,6 @@
 import json
 import os
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, ConfigDict
 from pydantic_settings import BaseSettings
@@ -12,6 +12,9 @@ class MCPServerConfig(BaseModel):
     args: List[str] = []
     env: Dict[str, str] = {}
     disabled: bool = False
+    max_rss_mb: Optional[int] = None
+    cpu_seconds: Optional[int] = None
+    nice: Optional[int] = None
 
 class UnifiedMCPConfig(BaseSettings):
     model_config = ConfigDict(env_file=".env", env_file_encoding="utf-8")
@@ -21,6 +24,15 @@ class UnifiedMCPConfig(BaseSettings):
     host: str = "localhost"
     port: int = 8929
     debug: bool = False
+    resource_sample_interval: float = 2.0
+    drain_timeout: float = 30.0
+    cgroup_delegate: bool = False
+    compression_min_size: int = 4096
+    result_page_size: int = 0
+    result_page_ttl: float = 600.0
+    result_page_max_bytes: int = 64 * 1024 * 1024
+    resource_cache_max_bytes: int = 0
+    resource_cache_ttl: float = 30.0
 
     def load_mcp_config(self) -> List[MCPServerConfig]:
         """Load MCP servers from mcp.json file"""
@@ -40,7 +52,10 @@ class UnifiedMCPConfig(BaseSettings):
                     name=name,
                     command=config["command"],
                     args=config.get("args", []),
-                    env=env
+                    env=env,
+                    max_rss_mb=config.get("max_rss_mb"),
+                    cpu_seconds=config.get("cpu_seconds"),
+                    nice=config.get("nice")
                 ))
 
             return servers
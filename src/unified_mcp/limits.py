@@ -0,0 +1,298 @@
+"""Resource limits for child MCP servers.
+
+This module is imported by the unified server to read limits from `mcp.json`
+and sample child processes, and is also executed directly as a small launcher
+that applies the limits to itself before exec'ing the real server command.
+It only uses the standard library so it can run without the package on the path.
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+LIMIT_KEYS = ("max_rss_mb", "cpu_seconds", "nice")
+
+# Environment marker used to find a server's process tree under /proc
+SERVER_ENV_MARKER = "UNIFIED_MCP_SERVER"
+
+# The sampler restarts a child at its limit; the kernel backstops only kick in
+# past this headroom, so a graceful drain normally wins the race.
+LIMIT_HEADROOM = 1.25
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+CGROUP_PREFIX = "unified-mcp-"
+
+
+def get_limits(server_config: dict) -> Dict[str, int]:
+    """Extract the configured resource limits from an mcp.json server entry"""
+    limits = {}
+    for key in LIMIT_KEYS:
+        value = server_config.get(key)
+        if value is not None:
+            limits[key] = int(value)
+    return limits
+
+
+def wrap_command(
+    name: str, command: str, args: List[str], limits: Dict[str, int]
+) -> Tuple[str, List[str]]:
+    """Route a server command through this launcher when limits are configured"""
+    if not limits:
+        return command, args
+
+    launcher_args = [str(Path(__file__).resolve()), "--name", name]
+    for key, value in limits.items():
+        launcher_args += [f"--{key.replace('_', '-')}", str(value)]
+    if "max_rss_mb" in limits:
+        group = cgroup_dir(name)
+        if group is not None:
+            launcher_args += ["--cgroup", str(group)]
+    return sys.executable, launcher_args + ["--", command, *args]
+
+
+# Delegated cgroup v2 subtree: None until probed, False when unavailable
+_cgroup_base = None
+
+
+def _own_cgroup() -> Optional[Path]:
+    """Return the cgroup v2 directory this process currently belongs to"""
+    if not (CGROUP_ROOT / "cgroup.controllers").exists():
+        return None
+    try:
+        for line in Path("/proc/self/cgroup").read_text().splitlines():
+            if line.startswith("0::"):
+                return CGROUP_ROOT / line[3:].lstrip("/")
+    except OSError:
+        pass
+    return None
+
+
+def _move_pid(group: Path, pid: str) -> None:
+    """Write a PID into a cgroup, ignoring processes that have already exited"""
+    try:
+        (group / "cgroup.procs").write_text(pid)
+    except ProcessLookupError:
+        pass
+
+
+def _owns_cgroup(pids: List[str]) -> bool:
+    """Whether every process in a cgroup is this process or one it spawned"""
+    own_pid = os.getpid()
+    parents = _parent_map()
+    for pid in map(int, pids):
+        while pid and pid != own_pid:
+            pid = parents.get(pid)
+        if pid != own_pid:
+            return False
+    return True
+
+
+def delegate_cgroup(force: bool = False) -> Optional[Path]:
+    """Turn our own cgroup into a subtree that can hold per-server groups.
+
+    cgroup v2 only lets a group distribute memory to children once it has no
+    processes of its own, so the processes in our cgroup are first moved into
+    a `main` leaf. Server groups are then created beside that leaf, keeping
+    them inside the service's or container's own accounting and kill scope.
+
+    Rearranging a cgroup shared with other processes (a login session scope,
+    a service without systemd delegation) is not ours to do, so this only
+    happens when the cgroup holds nothing but this process and its children,
+    or when force is set. A failure part way through moves the processes back.
+    """
+    global _cgroup_base
+    if _cgroup_base is not None:
+        return _cgroup_base or None
+
+    _cgroup_base = False
+    base = _own_cgroup()
+    if base is None:
+        print("cgroup v2 not available, memory limits rely on RSS sampling")
+        return None
+
+    leaf = base / "main"
+    moved = []
+    created = False
+    try:
+        pids = (base / "cgroup.procs").read_text().split()
+        if not force and not _owns_cgroup(pids):
+            print(
+                f"cgroup {base} is shared with other processes, memory limits rely "
+                "on RSS sampling (set CGROUP_DELEGATE=true to override)"
+            )
+            return None
+
+        if not leaf.exists():
+            leaf.mkdir()
+            created = True
+        for pid in pids:
+            _move_pid(leaf, pid)
+            moved.append(pid)
+        controllers = base / "cgroup.subtree_control"
+        if "memory" not in controllers.read_text().split():
+            controllers.write_text("+memory")
+    except OSError as e:
+        print(f"Cannot delegate cgroup {base} ({e}), memory limits rely on RSS sampling")
+        for pid in moved:
+            try:
+                _move_pid(base, pid)
+            except OSError:
+                pass
+        if created:
+            try:
+                leaf.rmdir()
+            except OSError:
+                pass
+        return None
+
+    _cgroup_base = base
+    return base
+
+
+def cgroup_dir(name: str) -> Optional[Path]:
+    """Return the cgroup v2 directory for a server inside our delegated subtree"""
+    base = delegate_cgroup()
+    if base is None:
+        return None
+    return base / f"{CGROUP_PREFIX}{name}"
+
+
+def _apply_cgroup(group: Path, max_rss_mb: int) -> bool:
+    """Move this process into a memory-limited cgroup v2 group"""
+    # memory.high is left unset: throttling at the limit would keep RSS just
+    # under it, so the sampler's graceful restart would never trigger.
+    limit = int(max_rss_mb * 1024 * 1024 * LIMIT_HEADROOM)
+    try:
+        group.mkdir(exist_ok=True)
+        (group / "memory.max").write_text(str(limit))
+        (group / "cgroup.procs").write_text(str(os.getpid()))
+        return True
+    except OSError as e:
+        print(f"Cannot apply cgroup memory limit in {group}: {e}", file=sys.stderr)
+        return False
+
+
+def remove_cgroup(name: str) -> None:
+    """Remove a server's cgroup once its processes have exited"""
+    if not _cgroup_base:
+        return
+    try:
+        (_cgroup_base / f"{CGROUP_PREFIX}{name}").rmdir()
+    except OSError:
+        pass
+
+
+def apply_limits(
+    cgroup: Optional[Path] = None,
+    max_rss_mb: Optional[int] = None,
+    cpu_seconds: Optional[int] = None,
+    nice: Optional[int] = None,
+) -> None:
+    """Apply resource limits to the current process before exec"""
+    try:
+        import resource
+    except ImportError:
+        return
+
+    if max_rss_mb is not None and cgroup is not None:
+        # There is no working RSS rlimit on Linux and RLIMIT_AS breaks runtimes
+        # that reserve large address ranges (V8, JVM), so without cgroup v2 the
+        # memory limit is enforced by the unified server's RSS sampler alone.
+        _apply_cgroup(cgroup, max_rss_mb)
+
+    if cpu_seconds is not None:
+        soft = int(cpu_seconds * LIMIT_HEADROOM) + 1
+        try:
+            resource.setrlimit(resource.RLIMIT_CPU, (soft, soft + 5))
+        except (ValueError, OSError):
+            pass
+
+    if nice is not None:
+        try:
+            os.nice(nice)
+        except OSError:
+            pass
+
+
+def _read_stat(pid: int) -> Optional[List[str]]:
+    """Read /proc/<pid>/stat fields following the command name"""
+    try:
+        data = Path(f"/proc/{pid}/stat").read_text()
+    except OSError:
+        return None
+    # The command name may contain spaces, so split after its closing paren
+    return data[data.rfind(")") + 2:].split()
+
+
+def _parent_map() -> Dict[int, int]:
+    """Map every visible PID to its parent PID"""
+    parents = {}
+    for entry in Path("/proc").iterdir():
+        if entry.name.isdigit():
+            fields = _read_stat(int(entry.name))
+            if fields:
+                parents[int(entry.name)] = int(fields[1])
+    return parents
+
+
+def find_server_pids(name: str, root_pid: Optional[int] = None) -> List[int]:
+    """Find descendants of root_pid that belong to the named child server"""
+    root_pid = root_pid or os.getpid()
+    parents = _parent_map()
+
+    marker = f"{SERVER_ENV_MARKER}={name}".encode()
+    pids = []
+    for pid in parents:
+        ancestor = parents.get(pid)
+        while ancestor and ancestor != root_pid:
+            ancestor = parents.get(ancestor)
+        if ancestor != root_pid:
+            continue
+        try:
+            environ = Path(f"/proc/{pid}/environ").read_bytes().split(b"\0")
+        except OSError:
+            continue
+        if marker in environ:
+            pids.append(pid)
+    return pids
+
+
+def sample_usage(pids: List[int]) -> Tuple[float, float]:
+    """Return total RSS in MB and total CPU seconds for the given processes"""
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    clock_ticks = os.sysconf("SC_CLK_TCK")
+    rss_bytes = 0
+    cpu_ticks = 0
+    for pid in pids:
+        fields = _read_stat(pid)
+        if not fields:
+            continue
+        # utime and stime are fields 14 and 15, rss is field 24 (in pages)
+        cpu_ticks += int(fields[11]) + int(fields[12])
+        rss_bytes += int(fields[21]) * page_size
+    return rss_bytes / (1024 * 1024), cpu_ticks / clock_ticks
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Launcher entry point: apply limits, then exec the server command"""
+    parser = argparse.ArgumentParser(description="Run an MCP server with limits")
+    parser.add_argument("--name", required=True)
+    parser.add_argument("--max-rss-mb", type=int)
+    parser.add_argument("--cpu-seconds", type=int)
+    parser.add_argument("--nice", type=int)
+    parser.add_argument("--cgroup", type=Path)
+    parser.add_argument("command", nargs=argparse.REMAINDER)
+    args = parser.parse_args(argv)
+
+    command = args.command[1:] if args.command[:1] == ["--"] else args.command
+    if not command:
+        parser.error("missing server command")
+
+    apply_limits(args.cgroup, args.max_rss_mb, args.cpu_seconds, args.nice)
+    os.execvp(command[0], command)
+
+
+if __name__ == "__main__":
+    main()
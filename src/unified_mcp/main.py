@@ -11,14 +11,130 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from fastmcp import FastMCP
 from fastmcp.client import Client
 from fastmcp.client.transports import StdioTransport
-
+from fastmcp.server.server import has_resource_prefix, remove_resource_prefix
+from starlette.middleware import Middleware
+
+from unified_mcp.cache import (
+    CacheInvalidationHandler,
+    MountListingMiddleware,
+    ResourceCache,
+    ResourceCacheMiddleware,
+)
+from unified_mcp.compression import CompressionMiddleware
 from unified_mcp.config import config
+from unified_mcp.limits import (
+    SERVER_ENV_MARKER,
+    delegate_cgroup,
+    find_server_pids,
+    get_limits,
+    remove_cgroup,
+    sample_usage,
+    wrap_command,
+)
+from unified_mcp.pagination import (
+    ResultPager,
+    ResultPagingMiddleware,
+    page_footer,
+)
 
 # Create unified MCP server
 mcp = FastMCP("unified-mcp")
 mounted_servers = {}
+monitor_tasks = {}
+server_usage = {}
+subscribed_resources = {}
+pending_subscriptions = set()
 shutdown_event = asyncio.Event()
 
+
+class DrainState:
+    """In-flight request count and draining flag shared by client copies"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.in_flight = 0
+        self.draining = False
+
+
+class DrainableClient(Client):
+    """Client that counts in-flight proxy requests so a restart can drain them.
+
+    The proxy copies this client for every request, so the counter and flag
+    live on a shared object rather than on the client itself. New requests
+    fail fast while draining, so parent listings skip this mount instead of
+    waiting for the restart.
+    """
+
+    def __init__(self, name: str, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.drain = DrainState(name)
+
+    async def __aenter__(self):
+        if self.drain.draining:
+            raise RuntimeError(f"Server '{self.drain.name}' is restarting")
+        self.drain.in_flight += 1
+        try:
+            return await super().__aenter__()
+        except BaseException:
+            self.drain.in_flight -= 1
+            raise
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        try:
+            return await super().__aexit__(exc_type, exc_val, exc_tb)
+        finally:
+            self.drain.in_flight -= 1
+
+
+async def subscribe_resource(uri: str):
+    """Subscribe to updates for a cached resource on the child serving it"""
+    for name, client in mounted_servers.items():
+        try:
+            if not has_resource_prefix(uri, name):
+                continue
+        except ValueError:
+            return
+        if uri in subscribed_resources.get(name, ()) or uri in pending_subscriptions:
+            return
+        pending_subscriptions.add(uri)
+        try:
+            async with client:
+                capabilities = client.initialize_result.capabilities
+                if capabilities.resources and capabilities.resources.subscribe:
+                    await client.session.subscribe_resource(
+                        remove_resource_prefix(uri, name)
+                    )
+            # Marked only on success so transient failures are retried
+            subscribed_resources.setdefault(name, set()).add(uri)
+        except Exception as e:
+            print(f"Could not subscribe to '{uri}' on '{name}': {e}")
+        finally:
+            pending_subscriptions.discard(uri)
+        return
+
+result_pager = None
+if config.result_page_size > 0:
+    result_pager = ResultPager(
+        config.result_page_size,
+        ttl=config.result_page_ttl,
+        max_bytes=config.result_page_max_bytes,
+    )
+    mcp.add_middleware(ResultPagingMiddleware(result_pager))
+
+resource_cache = None
+if config.resource_cache_max_bytes > 0:
+    resource_cache = ResourceCache(
+        config.resource_cache_max_bytes, ttl=config.resource_cache_ttl
+    )
+    mcp.add_middleware(ResourceCacheMiddleware(resource_cache, on_fill=subscribe_resource))
+
+
+def forget_server_state(name: str):
+    """Drop cached resources and subscriptions tied to a child process"""
+    subscribed_resources.pop(name, None)
+    if resource_cache is not None:
+        resource_cache.invalidate_server(name)
+
 def load_mcp_servers():
     try:
         with open("mcp.json", "r") as f:
@@ -30,14 +146,71 @@ def load_mcp_servers():
 
 async def cleanup_servers():
     """Cleanup mounted servers"""
+    for task in monitor_tasks.values():
+        task.cancel()
+    monitor_tasks.clear()
+
     for name, client in mounted_servers.items():
         try:
             await client.close()
+            remove_cgroup(name)
+            forget_server_state(name)
             print(f"Closed server: {name}")
         except Exception:
             pass
     mounted_servers.clear()
 
+async def restart_server(name: str, client: DrainableClient):
+    """Drain in-flight requests, then stop the child so it respawns on next use"""
+    drain = client.drain
+    drain.draining = True
+    try:
+        deadline = asyncio.get_running_loop().time() + config.drain_timeout
+        while drain.in_flight > 0 and asyncio.get_running_loop().time() < deadline:
+            await asyncio.sleep(0.1)
+        if drain.in_flight > 0:
+            print(f"Drain timed out for '{name}' with {drain.in_flight} requests in flight")
+
+        await client.close()
+        remove_cgroup(name)
+        forget_server_state(name)
+        server_usage[name]["restarts"] += 1
+        print(f"Restarted server: {name}")
+    finally:
+        drain.draining = False
+
+async def monitor_server(name: str, client: DrainableClient, limits: dict):
+    """Sample a child's RSS and CPU time and restart it when it overruns"""
+    stats = server_usage[name]
+    while True:
+        await asyncio.sleep(config.resource_sample_interval)
+        try:
+            pids = await asyncio.to_thread(find_server_pids, name)
+            if not pids:
+                continue
+            rss_mb, cpu_seconds = sample_usage(pids)
+            stats["rss_mb"] = round(rss_mb, 1)
+            stats["cpu_seconds"] = round(cpu_seconds, 1)
+
+            overrun = None
+            if "max_rss_mb" in limits and rss_mb > limits["max_rss_mb"]:
+                overrun = "max_rss_mb"
+            elif "cpu_seconds" in limits and cpu_seconds > limits["cpu_seconds"]:
+                overrun = "cpu_seconds"
+            if overrun is None:
+                continue
+
+            stats["limit_hits"][overrun] = stats["limit_hits"].get(overrun, 0) + 1
+            print(
+                f"Server '{name}' exceeded {overrun}={limits[overrun]} "
+                f"(rss {rss_mb:.0f} MB, cpu {cpu_seconds:.0f}s), restarting"
+            )
+            await restart_server(name, client)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Error monitoring server '{name}': {e}")
+
 async def reload_servers():
     """Hot reload servers by unmounting and remounting"""
     print("Reloading servers...")
@@ -48,6 +221,8 @@ async def reload_servers():
 async def setup_proxy_servers():
     """Setup and mount child MCP servers as proxies"""
     server_configs = load_mcp_servers()
+    if any(c.get("max_rss_mb") and not c.get("disabled") for c in server_configs.values()):
+        delegate_cgroup(force=config.cgroup_delegate)
 
     for name, server_config in server_configs.items():
         if server_config.get("disabled", False):
@@ -57,20 +232,43 @@ async def setup_proxy_servers():
         try:
             print(f"Setting up server: {name}")
 
+            limits = get_limits(server_config)
+            command, args = wrap_command(
+                name, server_config["command"], server_config.get("args", []), limits
+            )
             transport = StdioTransport(
-                command=server_config["command"],
-                args=server_config.get("args", []),
-                env={**os.environ, **server_config.get("env", {})}
+                command=command,
+                args=args,
+                env={
+                    **os.environ,
+                    **server_config.get("env", {}),
+                    SERVER_ENV_MARKER: name,
+                }
             )
 
-            client = Client(transport)
+            message_handler = None
+            if resource_cache is not None:
+                message_handler = CacheInvalidationHandler(resource_cache, name)
+            client = DrainableClient(name, transport, message_handler=message_handler)
             proxy_server = FastMCP.as_proxy(client, name=name)
+            if resource_cache is not None:
+                proxy_server.add_middleware(MountListingMiddleware(resource_cache))
 
             # Wait a moment for initialization
             await asyncio.sleep(1)
 
             mcp.mount(proxy_server, prefix=name)
             mounted_servers[name] = client
+            if resource_cache is not None:
+                # Listings fetched while this mount was pending lack the server
+                resource_cache.invalidate_listings()
+            server_usage.setdefault(
+                name, {"restarts": 0, "limit_hits": {}, "rss_mb": 0, "cpu_seconds": 0}
+            )
+            if "max_rss_mb" in limits or "cpu_seconds" in limits:
+                monitor_tasks[name] = asyncio.create_task(
+                    monitor_server(name, client, limits)
+                )
 
             print(f"Mounted server '{name}' at /{name}/mcp")
 
@@ -147,6 +345,39 @@ def list_servers() -> str:
         server_info.append(f"{name}: {status} - {endpoint}")
     return "\n".join(server_info)
 
+@mcp.tool()
+def server_stats() -> str:
+    """Show resource usage, limit hits and restarts per mounted server"""
+    servers = load_mcp_servers()
+    report = []
+    for name, stats in sorted(server_usage.items()):
+        limits = get_limits(servers.get(name, {}))
+        limit_text = ", ".join(f"{k}={v}" for k, v in limits.items()) or "none"
+        hits = ", ".join(f"{k}={v}" for k, v in stats["limit_hits"].items()) or "none"
+        report.append(
+            f"{name}: limits {limit_text} - rss {stats['rss_mb']} MB, "
+            f"cpu {stats['cpu_seconds']}s - limit hits {hits} - "
+            f"restarts {stats['restarts']}"
+        )
+    if resource_cache is not None:
+        report.append(
+            f"resource cache: {len(resource_cache)} reads, "
+            f"{resource_cache.size} bytes - hits {resource_cache.hits}, "
+            f"misses {resource_cache.misses}"
+        )
+    return "\n".join(report) or "No servers mounted"
+
+@mcp.tool()
+def fetch_result_page(cursor: str) -> str:
+    """Fetch the next page of an oversized tool result using its cursor"""
+    if result_pager is None:
+        return "Result paging is disabled (set RESULT_PAGE_SIZE to enable it)"
+    try:
+        text, number, total, next_cursor = result_pager.fetch(cursor)
+    except KeyError:
+        return f"Unknown or expired cursor: {cursor}"
+    return f"{text}\n{page_footer(number, total, next_cursor)}"
+
 async def main():
     """Main entry point for the unified MCP server."""
     # Setup signal handlers
@@ -159,8 +390,18 @@ async def main():
         print(f"Starting unified MCP server on {config.host}:{config.port}")
 
         # Run server with shutdown handling
+        middleware = []
+        if config.compression_min_size > 0:
+            middleware.append(
+                Middleware(CompressionMiddleware, minimum_size=config.compression_min_size)
+            )
         server_task = asyncio.create_task(
-            mcp.run_async(transport="streamable-http", host=config.host, port=config.port)
+            mcp.run_async(
+                transport="streamable-http",
+                host=config.host,
+                port=config.port,
+                middleware=middleware
+            )
         )
 
         # Wait for shutdown signal
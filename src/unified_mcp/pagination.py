@@ -0,0 +1,123 @@
+"""Server-side paging of oversized tool results.
+
+When enabled, text results larger than the page size are stored in memory and
+the caller receives the first page plus a cursor. The remaining pages are
+served by the `fetch_result_page` management tool until the entry expires or
+is evicted to keep the store within its byte budget. A result larger than the
+whole budget is returned unpaged.
+"""
+
+import secrets
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+from fastmcp.tools.tool import ToolResult
+from mcp.types import TextContent
+
+FETCH_TOOL_NAME = "fetch_result_page"
+
+
+class ResultPager:
+    """In-memory store of paged results, expired by TTL and capped in bytes"""
+
+    def __init__(self, page_size: int, ttl: float = 600.0, max_bytes: int = 64 * 1024 * 1024):
+        self.page_size = page_size
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._results: "OrderedDict[str, Tuple[float, int, str]]" = OrderedDict()
+
+    def _drop(self, result_id: str) -> None:
+        _, size, _ = self._results.pop(result_id)
+        self.size -= size
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        for result_id, (expires, _, _) in list(self._results.items()):
+            if expires <= now:
+                self._drop(result_id)
+        while self.size > self.max_bytes:
+            self._drop(next(iter(self._results)))
+
+    def page_count(self, text: str) -> int:
+        return max(1, -(-len(text) // self.page_size))
+
+    def store(self, text: str) -> Optional[str]:
+        """Store a full result and return the cursor for its second page.
+
+        Returns None when the result alone exceeds the byte budget.
+        """
+        size = len(text.encode())
+        if size > self.max_bytes:
+            return None
+        result_id = secrets.token_urlsafe(12)
+        self._results[result_id] = (time.monotonic() + self.ttl, size, text)
+        self.size += size
+        self._expire()
+        return f"{result_id}:2"
+
+    def fetch(self, cursor: str) -> Tuple[str, int, int, Optional[str]]:
+        """Return (page text, page number, total pages, next cursor) for a cursor"""
+        self._expire()
+        result_id, _, page = cursor.rpartition(":")
+        if result_id not in self._results or not page.isdigit():
+            raise KeyError(cursor)
+
+        text = self._results[result_id][2]
+        total = self.page_count(text)
+        number = int(page)
+        if not 1 <= number <= total:
+            raise KeyError(cursor)
+
+        start = (number - 1) * self.page_size
+        next_cursor = f"{result_id}:{number + 1}" if number < total else None
+        return text[start:start + self.page_size], number, total, next_cursor
+
+
+def page_footer(number: int, total: int, next_cursor: Optional[str]) -> str:
+    """Describe the current page and how to fetch the next one"""
+    if next_cursor is None:
+        return f"[Page {number} of {total}. End of result.]"
+    return (
+        f"[Page {number} of {total}. Call {FETCH_TOOL_NAME} with "
+        f"cursor=\"{next_cursor}\" for the next page.]"
+    )
+
+
+class ResultPagingMiddleware(Middleware):
+    """Replace oversized text tool results with their first page and a cursor.
+
+    Clients validate structured content against the tool's output schema, so
+    results carrying it are left alone, except FastMCP's wrapped `str` form
+    (`{"result": <text>}`), whose page still fits the `result: string` schema.
+    """
+
+    def __init__(self, pager: ResultPager):
+        self.pager = pager
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next) -> ToolResult:
+        result = await call_next(context)
+        if context.message.name == FETCH_TOOL_NAME:
+            return result
+        if not all(isinstance(block, TextContent) for block in result.content):
+            return result
+
+        text = "\n".join(block.text for block in result.content)
+        wrapped = result.structured_content == {"result": text}
+        if result.structured_content is not None and not wrapped:
+            return result
+        if len(text) <= self.pager.page_size:
+            return result
+
+        cursor = self.pager.store(text)
+        if cursor is None:
+            return result
+        first_page = text[:self.pager.page_size]
+        footer = page_footer(1, self.pager.page_count(text), cursor)
+        return ToolResult(
+            content=[TextContent(type="text", text=first_page), TextContent(type="text", text=footer)],
+            structured_content={"result": f"{first_page}\n{footer}"} if wrapped else None,
+            meta=result.meta,
+        )
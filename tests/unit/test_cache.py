@@ -0,0 +1,165 @@
+import asyncio
+from types import SimpleNamespace
+
+from fastmcp import Client, FastMCP
+from fastmcp.server.middleware import Middleware
+
+from unified_mcp.cache import (
+    CacheInvalidationHandler,
+    MountListingMiddleware,
+    ResourceCache,
+    ResourceCacheMiddleware,
+)
+
+
+def test_cache_evicts_least_recently_used_over_budget():
+    """Test that reads beyond the byte budget evict the oldest entry"""
+    cache = ResourceCache(max_bytes=10)
+    cache.put_read("data://a/1", "a", 4)
+    cache.put_read("data://a/2", "b", 4)
+    cache.get_read("data://a/1")
+    cache.put_read("data://a/3", "c", 4)
+
+    assert cache.get_read("data://a/2") is None
+    assert cache.get_read("data://a/1") == "a"
+    assert cache.size == 8
+
+
+def test_cache_expires_entries_after_ttl():
+    """Test the TTL fallback for reads and listings"""
+    cache = ResourceCache(max_bytes=100, ttl=0)
+    cache.put_read("data://a/1", "a", 1)
+    cache.put_listing("prompts", ["p"])
+
+    assert cache.get_read("data://a/1") is None
+    assert cache.get_listing("prompts") is None
+    assert cache.size == 0
+
+
+async def test_notifications_invalidate_entries():
+    """Test that child notifications drop the matching cache entries"""
+    cache = ResourceCache(max_bytes=100)
+    cache.put_read("data://kid/doc", "doc", 3)
+    cache.put_read("data://other/doc", "doc", 3)
+    cache.put_listing("resources", ["r"])
+    handler = CacheInvalidationHandler(cache, "kid")
+
+    await handler.on_resource_updated(SimpleNamespace(params=SimpleNamespace(uri="data://doc")))
+    assert cache.get_read("data://kid/doc") is None
+    assert cache.get_read("data://other/doc") == "doc"
+
+    cache.put_read("data://kid/doc", "doc", 3)
+    await handler.on_resource_list_changed(None)
+    assert cache.get_read("data://kid/doc") is None
+    assert cache.get_read("data://other/doc") == "doc"
+    assert cache.get_listing("resources") is None
+
+
+async def test_middleware_serves_repeated_reads_from_cache():
+    """Test that identical reads and listings reach the server only once"""
+    server = FastMCP("test")
+    cache = ResourceCache(max_bytes=1024)
+    server.add_middleware(ResourceCacheMiddleware(cache))
+    reads = []
+
+    @server.resource("data://doc")
+    def doc() -> str:
+        reads.append(1)
+        return "contents"
+
+    async with Client(server) as client:
+        for _ in range(3):
+            contents = await client.read_resource("data://doc")
+            assert contents[0].text == "contents"
+        await client.list_resources()
+        await client.list_resources()
+
+    assert len(reads) == 1
+    assert cache.hits == 2
+    assert cache.get_listing("resources") is not None
+
+
+async def test_partial_listing_is_not_cached():
+    """Test that a listing missing a failed mount is refetched next time"""
+    class FailingListing(Middleware):
+        async def on_list_resources(self, context, call_next):
+            raise RuntimeError("child not ready")
+
+    server = FastMCP("test")
+    cache = ResourceCache(max_bytes=1024)
+    server.add_middleware(ResourceCacheMiddleware(cache))
+
+    child = FastMCP("child")
+    child.add_middleware(MountListingMiddleware(cache))
+    child.add_middleware(FailingListing())
+    server.mount(child, prefix="kid")
+
+    async with Client(server) as client:
+        assert await client.list_resources() == []
+
+    assert cache.listing_failures == 1
+    assert cache.get_listing("resources") is None
+
+
+async def test_fill_hook_does_not_delay_reads():
+    """Test that the subscribe hook runs in the background"""
+    server = FastMCP("test")
+    cache = ResourceCache(max_bytes=1024)
+    released = asyncio.Event()
+    filled = []
+
+    async def on_fill(uri):
+        await released.wait()
+        filled.append(uri)
+
+    server.add_middleware(ResourceCacheMiddleware(cache, on_fill=on_fill))
+
+    @server.resource("data://doc")
+    def doc() -> str:
+        return "contents"
+
+    async with Client(server) as client:
+        contents = await asyncio.wait_for(client.read_resource("data://doc"), 5)
+        assert contents[0].text == "contents"
+        assert filled == []
+
+        released.set()
+        await asyncio.sleep(0.1)
+        assert filled == ["data://doc"]
+
+
+async def test_update_during_slow_read_is_not_cached():
+    """Test that a read overtaken by an update notification is not cached"""
+    server = FastMCP("test")
+    cache = ResourceCache(max_bytes=1024)
+    server.add_middleware(ResourceCacheMiddleware(cache))
+    handler = CacheInvalidationHandler(cache, "kid")
+    versions = iter(["old", "new"])
+
+    @server.resource("data://kid/doc")
+    async def doc() -> str:
+        contents = next(versions)
+        if contents == "old":
+            # The child changes the document while this read is in flight
+            await handler.on_resource_updated(
+                SimpleNamespace(params=SimpleNamespace(uri="data://doc"))
+            )
+        return contents
+
+    async with Client(server) as client:
+        assert (await client.read_resource("data://kid/doc"))[0].text == "old"
+        assert cache.get_read("data://kid/doc") is None
+        assert (await client.read_resource("data://kid/doc"))[0].text == "new"
+        assert (await client.read_resource("data://kid/doc"))[0].text == "new"
+
+
+def test_server_invalidation_discards_reads_in_progress():
+    """Test that a list_changed during a read also prevents caching it"""
+    cache = ResourceCache(max_bytes=1024)
+    token = cache.read_token("data://kid/doc")
+    cache.invalidate_server("kid")
+    cache.put_read("data://kid/doc", "old", 3, token)
+    assert cache.get_read("data://kid/doc") is None
+
+    cache.put_read("data://kid/doc", "new", 3, cache.read_token("data://kid/doc"))
+    assert cache.get_read("data://kid/doc") == "new"
@@ -0,0 +1,81 @@
+import gzip
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from unified_mcp.compression import CompressionMiddleware, negotiate_encoding
+
+
+def make_client(minimum_size=100):
+    async def small(request):
+        return PlainTextResponse("ok")
+
+    async def large(request):
+        return PlainTextResponse("x" * 1000)
+
+    async def events(request):
+        async def stream():
+            yield b"data: progress\n\n"
+            yield b"data: " + b"x" * 1000 + b"\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    app = Starlette(
+        routes=[
+            Route("/small", small),
+            Route("/large", large),
+            Route("/events", events, methods=["GET", "POST"]),
+        ],
+        middleware=[Middleware(CompressionMiddleware, minimum_size=minimum_size)],
+    )
+    return TestClient(app)
+
+
+def test_negotiate_encoding():
+    """Test Accept-Encoding negotiation honours q-values"""
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("gzip;q=0, br") is None
+    assert negotiate_encoding("") is None
+
+
+def test_large_response_is_compressed():
+    """Test that responses above the threshold are gzip encoded"""
+    client = make_client()
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text == "x" * 1000
+
+
+def test_small_response_is_not_compressed():
+    """Test that responses below the threshold pass through untouched"""
+    client = make_client()
+    response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.text == "ok"
+
+
+def test_compressed_body_is_valid_gzip():
+    """Test that the raw body decodes as a gzip stream"""
+    client = make_client()
+    with client.stream("GET", "/large", headers={"Accept-Encoding": "gzip"}) as response:
+        raw = b"".join(response.iter_raw())
+    assert gzip.decompress(raw) == b"x" * 1000
+
+
+def test_post_event_stream_is_compressed_from_first_event():
+    """Test that a small first event does not leave the stream uncompressed"""
+    client = make_client()
+    with client.stream("POST", "/events", headers={"Accept-Encoding": "gzip"}) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        raw = b"".join(response.iter_raw())
+    assert gzip.decompress(raw).startswith(b"data: progress\n\ndata: xxx")
+
+
+def test_get_event_stream_is_not_compressed():
+    """Test that GET notification streams pass through untouched"""
+    client = make_client()
+    response = client.get("/events", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
@@ -0,0 +1,118 @@
+import os
+import subprocess
+import sys
+import time
+
+from unified_mcp import limits
+from unified_mcp.limits import (
+    SERVER_ENV_MARKER,
+    find_server_pids,
+    get_limits,
+    sample_usage,
+    wrap_command,
+)
+
+
+def test_get_limits_ignores_unset_fields():
+    """Test extracting limits from an mcp.json server entry"""
+    limits = get_limits({"command": "npx", "max_rss_mb": "512", "nice": 5})
+    assert limits == {"max_rss_mb": 512, "nice": 5}
+
+
+def test_wrap_command_without_limits():
+    """Test that servers without limits run their command directly"""
+    assert wrap_command("test", "npx", ["pkg"], {}) == ("npx", ["pkg"])
+
+
+def test_launcher_applies_nice_and_execs():
+    """Test that the launcher applies limits and execs the server command"""
+    command, args = wrap_command(
+        "test",
+        sys.executable,
+        ["-c", "import os; print(os.nice(0))"],
+        {"nice": 3, "cpu_seconds": 60},
+    )
+    result = subprocess.run([command, *args], capture_output=True, text=True)
+    assert result.returncode == 0
+    assert int(result.stdout) == os.nice(0) + 3
+
+
+def test_find_and_sample_server_process():
+    """Test locating a child server by its marker and sampling its usage"""
+    process = subprocess.Popen(
+        [sys.executable, "-c", "import time; time.sleep(30)"],
+        env={**os.environ, SERVER_ENV_MARKER: "sampled"},
+    )
+    try:
+        time.sleep(0.2)
+        pids = find_server_pids("sampled")
+        assert pids == [process.pid]
+        assert find_server_pids("other") == []
+
+        rss_mb, cpu_seconds = sample_usage(pids)
+        assert rss_mb > 1
+        assert cpu_seconds >= 0
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def fake_cgroup(tmp_path, monkeypatch, pids):
+    """Point the cgroup helpers at a fake cgroup directory holding pids"""
+    (tmp_path / "cgroup.procs").write_text("\n".join(map(str, pids)) + "\n")
+    (tmp_path / "cgroup.subtree_control").write_text("")
+    monkeypatch.setattr(limits, "_cgroup_base", None)
+    monkeypatch.setattr(limits, "_own_cgroup", lambda: tmp_path)
+
+
+def test_delegate_cgroup_moves_processes_into_leaf(tmp_path, monkeypatch):
+    """Test that server groups are created inside our own delegated cgroup"""
+    fake_cgroup(tmp_path, monkeypatch, [os.getpid()])
+
+    assert limits.cgroup_dir("kid") == tmp_path / "unified-mcp-kid"
+    assert (tmp_path / "main" / "cgroup.procs").read_text() == str(os.getpid())
+    assert (tmp_path / "cgroup.subtree_control").read_text() == "+memory"
+
+
+def test_delegate_cgroup_refuses_shared_cgroup(tmp_path, monkeypatch):
+    """Test that a cgroup holding foreign processes is left alone unless forced"""
+    fake_cgroup(tmp_path, monkeypatch, [os.getpid(), 1])
+
+    assert limits.delegate_cgroup() is None
+    assert not (tmp_path / "main").exists()
+
+    monkeypatch.setattr(limits, "_cgroup_base", None)
+    assert limits.delegate_cgroup(force=True) == tmp_path
+
+
+def test_delegate_cgroup_rolls_back_partial_moves(tmp_path, monkeypatch):
+    """Test that a failed move returns already-moved processes to our cgroup"""
+    fake_cgroup(tmp_path, monkeypatch, [os.getpid(), 1])
+    moves = []
+
+    def move_pid(group, pid):
+        if group.name == "main" and pid == "1":
+            raise PermissionError("EACCES")
+        moves.append((group, pid))
+
+    monkeypatch.setattr(limits, "_move_pid", move_pid)
+
+    assert limits.delegate_cgroup(force=True) is None
+    assert moves == [
+        (tmp_path / "main", str(os.getpid())),
+        (tmp_path, str(os.getpid())),
+    ]
+    assert not (tmp_path / "main").exists()
+    assert (tmp_path / "cgroup.subtree_control").read_text() == ""
+    assert limits.cgroup_dir("kid") is None
+
+
+def test_delegate_cgroup_unavailable(monkeypatch):
+    """Test that a missing cgroup v2 hierarchy disables cgroup limits"""
+    monkeypatch.setattr(limits, "_cgroup_base", None)
+    monkeypatch.setattr(limits, "_own_cgroup", lambda: None)
+
+    assert limits.cgroup_dir("kid") is None
+    assert wrap_command("kid", "npx", [], {"max_rss_mb": 64})[1][-3:] == [
+        "64", "--", "npx"
+    ]
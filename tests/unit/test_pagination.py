@@ -0,0 +1,86 @@
+import pytest
+from fastmcp import Client, FastMCP
+
+from unified_mcp.pagination import ResultPager, ResultPagingMiddleware
+
+
+def test_pager_returns_pages_until_end():
+    """Test walking a stored result page by page"""
+    pager = ResultPager(page_size=4)
+    cursor = pager.store("abcdefghij")
+
+    text, number, total, cursor = pager.fetch(cursor)
+    assert (text, number, total) == ("efgh", 2, 3)
+
+    text, number, total, cursor = pager.fetch(cursor)
+    assert (text, number, total, cursor) == ("ij", 3, 3, None)
+
+
+def test_pager_rejects_unknown_and_expired_cursors():
+    """Test that stale cursors are reported as missing"""
+    pager = ResultPager(page_size=4, ttl=0)
+    cursor = pager.store("abcdefghij")
+
+    with pytest.raises(KeyError):
+        pager.fetch(cursor)
+    with pytest.raises(KeyError):
+        pager.fetch("missing:2")
+
+
+def test_pager_evicts_oldest_results_over_byte_budget():
+    """Test that stored results are evicted by size, oldest first"""
+    pager = ResultPager(page_size=4, max_bytes=25)
+    first = pager.store("a" * 10)
+    second = pager.store("b" * 10)
+    pager.store("c" * 10)
+
+    with pytest.raises(KeyError):
+        pager.fetch(first)
+    assert pager.fetch(second)[0] == "bbbb"
+    assert pager.size == 20
+    assert pager.store("d" * 30) is None
+
+
+async def test_middleware_pages_oversized_results():
+    """Test that oversized text results are replaced by a first page"""
+    server = FastMCP("test")
+    pager = ResultPager(page_size=10)
+    server.add_middleware(ResultPagingMiddleware(pager))
+
+    @server.tool(output_schema=None)
+    def big() -> str:
+        return "0123456789" * 3
+
+    @server.tool(output_schema=None)
+    def small() -> str:
+        return "short"
+
+    async with Client(server) as client:
+        result = await client.call_tool("big")
+        assert result.content[0].text == "0123456789"
+        assert "Page 1 of 3" in result.content[1].text
+
+        result = await client.call_tool("small")
+        assert [block.text for block in result.content] == ["short"]
+
+
+async def test_middleware_pages_default_fastmcp_str_results():
+    """Test that FastMCP's wrapped str results are paged with valid structured content"""
+    server = FastMCP("test")
+    server.add_middleware(ResultPagingMiddleware(ResultPager(page_size=10)))
+
+    @server.tool()
+    def big() -> str:
+        return "0123456789" * 3
+
+    @server.tool()
+    def records() -> dict:
+        return {"rows": "0123456789" * 3}
+
+    async with Client(server) as client:
+        result = await client.call_tool("big")
+        assert result.content[0].text == "0123456789"
+        assert result.data.startswith("0123456789\n[Page 1 of 3.")
+
+        result = await client.call_tool("records")
+        assert result.data == {"rows": "0123456789" * 3}
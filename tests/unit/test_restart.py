@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+from fastmcp import FastMCP
+
+from unified_mcp import main
+
+
+@pytest.fixture
+def child(monkeypatch):
+    """A drainable client for an in-memory child server, with fresh usage stats"""
+    server = FastMCP("child")
+
+    @server.tool()
+    async def slow() -> str:
+        await asyncio.sleep(0.3)
+        return "done"
+
+    monkeypatch.setattr(main, "server_usage", {
+        "kid": {"restarts": 0, "limit_hits": {}, "rss_mb": 0, "cpu_seconds": 0}
+    })
+    monkeypatch.setattr(main.config, "drain_timeout", 5.0)
+    return main.DrainableClient("kid", server)
+
+
+async def test_client_counts_in_flight_requests(child):
+    """Test that each open request is counted until it finishes"""
+    async with child.new() as client:
+        assert child.drain.in_flight == 1
+        await client.list_tools()
+    assert child.drain.in_flight == 0
+
+
+async def test_client_rejects_new_requests_while_draining(child):
+    """Test that new requests fail fast instead of waiting for a restart"""
+    child.drain.draining = True
+    with pytest.raises(RuntimeError, match="'kid' is restarting"):
+        async with child.new():
+            pass
+    assert child.drain.in_flight == 0
+
+
+async def test_restart_drains_in_flight_requests(child):
+    """Test that a restart waits for running calls and then counts itself"""
+    async def call_slow():
+        async with child.new() as client:
+            return (await client.call_tool("slow")).data
+
+    call = asyncio.create_task(call_slow())
+    await asyncio.sleep(0.1)
+    restart = asyncio.create_task(main.restart_server("kid", child))
+    await asyncio.sleep(0.05)
+
+    assert child.drain.draining
+    with pytest.raises(RuntimeError):
+        async with child.new():
+            pass
+    assert not restart.done()
+
+    assert await call == "done"
+    await restart
+    assert not child.drain.draining
+    assert main.server_usage["kid"]["restarts"] == 1
+
+    # The child respawns on next use
+    async with child.new() as client:
+        assert (await client.call_tool("slow")).data == "done"
+
+
+async def test_monitor_restarts_on_overrun(child, monkeypatch):
+    """Test that an RSS overrun is recorded and triggers a restart"""
+    monkeypatch.setattr(main.config, "resource_sample_interval", 0.01)
+    monkeypatch.setattr(main, "find_server_pids", lambda name: [1234])
+    monkeypatch.setattr(main, "sample_usage", lambda pids: (512.0, 3.0))
+
+    monitor = asyncio.create_task(main.monitor_server("kid", child, {"max_rss_mb": 100}))
+    try:
+        for _ in range(100):
+            if main.server_usage["kid"]["restarts"]:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        monitor.cancel()
+
+    stats = main.server_usage["kid"]
+    assert stats["restarts"] >= 1
+    assert stats["limit_hits"]["max_rss_mb"] >= 1
+    assert stats["rss_mb"] == 512.0
+    assert "cpu_seconds" not in stats["limit_hits"]
+
+
+async def test_monitor_ignores_usage_within_limits(child, monkeypatch):
+    """Test that a child under its limits is never restarted"""
+    monkeypatch.setattr(main.config, "resource_sample_interval", 0.01)
+    monkeypatch.setattr(main, "find_server_pids", lambda name: [1234])
+    monkeypatch.setattr(main, "sample_usage", lambda pids: (50.0, 3.0))
+
+    monitor = asyncio.create_task(
+        main.monitor_server("kid", child, {"max_rss_mb": 100, "cpu_seconds": 60})
+    )
+    await asyncio.sleep(0.1)
+    monitor.cancel()
+
+    assert main.server_usage["kid"]["restarts"] == 0
+    assert main.server_usage["kid"]["limit_hits"] == {}